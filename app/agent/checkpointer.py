@@ -1,25 +1,23 @@
 """LangGraph checkpointer using PostgreSQL.
 
 Provides conversation memory across requests using database persistence.
-
-NOTE: Checkpointing is currently disabled due to connection management complexity.
-This will be properly implemented in a future update.
 """
 
-from typing import Optional
-
-from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from psycopg_pool import AsyncConnectionPool
 
 
-async def get_checkpointer() -> Optional[BaseCheckpointSaver]:
+def get_checkpointer(pool: AsyncConnectionPool) -> AsyncPostgresSaver:
     """
-    Get PostgreSQL checkpointer for LangGraph.
+    Get PostgreSQL checkpointer for LangGraph backed by an existing pool.
     
-    Currently returns None (checkpointing disabled).
+    The pool is owned by the caller, which is responsible for opening it
+    before use and closing it on shutdown.
     
+    Args:
+        pool: Open psycopg connection pool
+        
     Returns:
-        None (checkpointing disabled for now)
+        AsyncPostgresSaver sharing the given pool
     """
-    # TODO: Implement proper async checkpointer with connection pooling
-    # For now, return None to disable checkpointing
-    return None
+    return AsyncPostgresSaver(pool)
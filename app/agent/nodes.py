@@ -6,6 +6,7 @@ Each node represents a step in the agent's reasoning process.
 import logging
 
 from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
 from langgraph.prebuilt import ToolNode
 
 from app.agent.state import AgentState
@@ -24,9 +25,6 @@ def create_tool_node() -> ToolNode:
     Returns:
         Configured ToolNode instance.
     """
-    # Import LangChain tool wrapper
-    from langchain_core.tools import tool
-    
     # Wrap MCP tools as LangChain tools
     @tool
     def add_todo_tool(task: str) -> dict:
@@ -90,9 +88,6 @@ async def call_model(state: AgentState) -> dict:
     Returns:
         Updated state with LLM response.
     """
-    # Get LLM with tools bound
-    from langchain_core.tools import tool
-    
     # Wrap tools for binding
     @tool
     def add_todo_tool(task: str) -> dict:
@@ -162,14 +157,12 @@ async def call_model(state: AgentState) -> dict:
         if not response.content and (not hasattr(response, 'tool_calls') or not response.tool_calls):
             logger.error("LLM returned empty response!")
             # Return a default response to avoid the error
-            from langchain_core.messages import AIMessage
             return {"messages": [AIMessage(content="I apologize, but I encountered an issue processing your request. Please try again.")]}
         
         return {"messages": [response]}
     
     except Exception as e:
         logger.error(f"Error in call_model: {e}", exc_info=True)
-        from langchain_core.messages import AIMessage
         return {"messages": [AIMessage(content=f"Error: {str(e)}")]}
 
 
@@ -1,39 +1,91 @@
 """API routes for the FastAPI application."""
 
+import asyncio
 import logging
 import uuid
 from typing import AsyncGenerator
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from langchain_core.messages import HumanMessage
-from sqlalchemy.ext.asyncio import AsyncSession
 from sse_starlette.sse import EventSourceResponse
 
+from app import __version__
 from app.agent.graph import create_agent_graph
 from app.api.schemas import ChatRequest, ChatResponse, HealthResponse
-from app.api.streaming import stream_agent_response
+from app.api.streaming import (
+    StreamEventType,
+    coalesce_events,
+    format_sse_event,
+    stream_agent_response,
+)
 from app.core.auth import verify_api_key
-from app.core.rate_limit import limiter
-from app.db.session import get_session
+from app.core.rate_limit import rate_limit
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Serialized once; returning raw bytes skips response model validation per probe
+HEALTH_RESPONSE_BODY = HealthResponse(status="healthy", version=__version__).model_dump_json().encode()
+
+
+async def get_agent_graph(request: Request):
+    """
+    Get the compiled agent graph shared across requests.
+    
+    The graph is compiled once in the application lifespan. If it is missing,
+    it is compiled lazily and cached on app state.
+    
+    Args:
+        request: FastAPI request object
+        
+    Returns:
+        Compiled StateGraph ready for execution.
+    """
+    state = request.app.state
+    agent_graph = getattr(state, "agent_graph", None)
+    if agent_graph is None:
+        agent_graph = state.agent_graph = create_agent_graph(
+            checkpointer=getattr(state, "checkpointer", None)
+        )
+    
+    return agent_graph
+
+
+def build_agent_input(message: str, session_id: str) -> tuple[dict, dict]:
+    """
+    Build the initial agent state and run config for a chat turn.
+    
+    The message has already been validated by the request schema, so the
+    HumanMessage is constructed without re-running Pydantic validation.
+    
+    Args:
+        message: User message
+        session_id: Session ID used as the checkpoint thread ID
+        
+    Returns:
+        Tuple of (initial_state, config)
+    """
+    initial_state = {
+        "messages": [HumanMessage.model_construct(content=message)],
+        "session_id": session_id,
+    }
+    config = {"configurable": {"thread_id": session_id}}
+    return initial_state, config
+
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check():
+async def health_check() -> Response:
     """Health check endpoint."""
-    return HealthResponse(status="healthy", version="0.1.0")
+    return Response(content=HEALTH_RESPONSE_BODY, media_type="application/json")
 
 
-@router.post("/chat", response_model=ChatResponse)
-@limiter.limit("100/minute")
+@router.post("/chat", response_model=ChatResponse, dependencies=[Depends(rate_limit)])
 async def chat(
-    request: Request,
     chat_request: ChatRequest,
-    session: AsyncSession = Depends(get_session),
+    debug: bool = Query(False, description="Include tool calls in the response"),
     api_key: str = Depends(verify_api_key),
+    agent_graph=Depends(get_agent_graph),
 ):
     """
     Chat with the AI agent.
@@ -41,63 +93,44 @@ async def chat(
     Requires authentication if AUTH_ENABLED=true in config.
     Rate limited to prevent abuse.
     Supports conversation memory via session_id.
+    Pass ?debug=true to include the tool calls made during processing.
     """
-    try:
-        # Get checkpointer from app state
-        checkpointer = request.app.state.checkpointer
-        
-        # Create agent graph with checkpointer
-        agent_graph = create_agent_graph(checkpointer=checkpointer)
-        
-        # Generate or use provided session ID for conversation memory
-        session_id = chat_request.session_id or str(uuid.uuid4())
-        
-        # Prepare initial state
-        initial_state = {
-            "messages": [HumanMessage(content=chat_request.message)],
-            "session_id": session_id,
-        }
-        
-        # Run the agent with checkpointing
-        config = {"configurable": {"thread_id": session_id}}
-        result = await agent_graph.ainvoke(initial_state, config=config)
-        
-        # Extract response
-        messages = result.get("messages", [])
-        if not messages:
-            raise HTTPException(status_code=500, detail="No response from agent")
-        
-        final_message = messages[-1]
-        response_text = final_message.content
-        
-        # Extract tool calls for debugging
-        tool_calls = []
-        for msg in messages:
-            if hasattr(msg, "tool_calls") and msg.tool_calls:
-                for tool_call in msg.tool_calls:
-                    tool_calls.append({
-                        "name": tool_call.get("name"),
-                        "args": tool_call.get("args"),
-                    })
-        
-        return ChatResponse(
-            response=response_text,
-            session_id=session_id,
-            tool_calls=tool_calls if tool_calls else None,
-        )
+    # Generate or use provided session ID for conversation memory
+    session_id = chat_request.session_id or uuid.uuid4().hex
+    
+    # Run the agent with checkpointing
+    initial_state, config = build_agent_input(chat_request.message, session_id)
+    result = await agent_graph.ainvoke(initial_state, config=config)
+    
+    # Extract response
+    messages = result.get("messages", [])
+    if not messages:
+        raise HTTPException(status_code=500, detail="No response from agent")
     
-    except Exception as e:
-        logger.error(f"Error in chat endpoint: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+    response_text = messages[-1].content
+    
+    # Extract tool calls only when debug info is requested
+    tool_calls = None
+    if debug:
+        tool_calls = [
+            {"name": tool_call.get("name"), "args": tool_call.get("args")}
+            for msg in messages
+            for tool_call in (getattr(msg, "tool_calls", None) or ())
+        ] or None
+    
+    return ChatResponse(
+        response=response_text,
+        session_id=session_id,
+        tool_calls=tool_calls,
+    )
 
 
-@router.get("/chat/stream")
-@limiter.limit("100/minute")
+@router.get("/chat/stream", dependencies=[Depends(rate_limit)])
 async def chat_stream(
-    request: Request,
     message: str = Query(..., description="User message"),
     session_id: str = Query(None, description="Session ID for conversation memory"),
     api_key: str = Depends(verify_api_key),
+    agent_graph=Depends(get_agent_graph),
 ) -> EventSourceResponse:
     """
     Stream chat responses via Server-Sent Events.
@@ -106,30 +139,23 @@ async def chat_stream(
     Rate limited to prevent abuse.
     Supports conversation memory via session_id.
     """
-    async def event_generator() -> AsyncGenerator[str, None]:
+    async def event_generator() -> AsyncGenerator[bytes, None]:
+        # Generate or use provided session ID
+        sid = session_id or uuid.uuid4().hex
+        
+        # Stream agent execution
+        initial_state, config = build_agent_input(message, sid)
+        events = stream_agent_response(agent_graph, initial_state, config)
+        
+        # Errors after the response has started can only be reported in-stream
         try:
-            # Get checkpointer from app state
-            checkpointer = request.app.state.checkpointer
-            
-            # Create agent graph with checkpointer
-            agent_graph = create_agent_graph(checkpointer=checkpointer)
-            
-            # Generate or use provided session ID
-            sid = session_id or str(uuid.uuid4())
-            
-            # Prepare initial state
-            initial_state = {
-                "messages": [HumanMessage(content=message)],
-                "session_id": sid,
-            }
-            
-            # Stream agent execution
-            config = {"configurable": {"thread_id": sid}}
-            async for event in stream_agent_response(agent_graph, initial_state, config):
+            async for event in coalesce_events(events):
                 yield event
+                # Yield to the event loop so each coalesced chunk is flushed
+                await asyncio.sleep(0)
         
         except Exception as e:
             logger.error(f"Error in streaming endpoint: {e}", exc_info=True)
-            yield f"event: error\ndata: {str(e)}\n\n"
+            yield format_sse_event(StreamEventType.ERROR, {"message": str(e)})
     
     return EventSourceResponse(event_generator())
@@ -27,7 +27,7 @@ class ChatResponse(BaseModel):
     session_id: str = Field(..., description="Session ID for this conversation")
     tool_calls: list[dict] | None = Field(
         default=None,
-        description="List of tools called during processing (for debugging)",
+        description="List of tools called during processing (only with ?debug=true)",
     )
 
 
@@ -3,9 +3,10 @@
 Provides async generators for streaming agent responses in real-time.
 """
 
-import json
+import asyncio
 from typing import AsyncIterator
 
+import orjson
 from langchain_core.messages import AIMessage, ToolMessage
 
 
@@ -20,20 +21,28 @@ class StreamEventType:
     DONE = "done"
 
 
-async def stream_agent_response(graph, input_data: dict) -> AsyncIterator[str]:
+async def stream_agent_response(
+    graph,
+    input_data: dict,
+    config: dict | None = None,
+) -> AsyncIterator[bytes]:
     """
     Stream agent execution events via Server-Sent Events.
     
+    Runs entirely on the event loop so Starlette never offloads iteration
+    to its threadpool.
+    
     Args:
         graph: Compiled LangGraph workflow
         input_data: Input data for the agent
+        config: Optional run config (e.g. thread_id for checkpointing)
         
     Yields:
-        SSE-formatted event strings
+        Encoded SSE event frames
     """
     try:
         # Stream events from the graph
-        async for event in graph.astream(input_data):
+        async for event in graph.astream(input_data, config=config):
             # Handle different event types
             for node_name, node_output in event.items():
                 if node_name == "agent":
@@ -86,15 +95,80 @@ async def stream_agent_response(graph, input_data: dict) -> AsyncIterator[str]:
         )
 
 
-def format_sse_event(event_type: str, data: dict) -> str:
+def format_sse_event(event_type: str, data: dict) -> bytes:
     """
     Format data as SSE event.
     
+    Frames are returned already encoded so the SSE response writes them
+    to the socket as-is instead of wrapping and re-encoding each one.
+    
     Args:
         event_type: Type of event
         data: Event data
         
     Returns:
-        SSE-formatted string
+        Encoded SSE frame
+    """
+    return b"event: %b\ndata: %b\n\n" % (event_type.encode(), orjson.dumps(data))
+
+
+async def coalesce_events(
+    events: AsyncIterator[bytes],
+    max_size: int = 4096,
+    max_delay: float = 0.02,
+) -> AsyncIterator[bytes]:
+    """
+    Batch SSE events that arrive in quick succession into larger chunks.
+    
+    An event that arrives after an idle period is sent immediately; events
+    arriving faster than max_delay are buffered until the buffer reaches
+    max_size bytes or max_delay seconds have passed since the last flush.
+    
+    Args:
+        events: Async iterator of encoded SSE event frames
+        max_size: Buffer size in bytes that forces a flush
+        max_delay: Maximum time in seconds an event is held back
+        
+    Yields:
+        Concatenated SSE event frames
     """
-    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+    loop = asyncio.get_running_loop()
+    iterator = aiter(events)
+    buffer = bytearray()
+    last_flush = loop.time()
+    pending = None
+    
+    try:
+        while True:
+            # Keep one pending read so a timeout never cancels the source generator
+            if pending is None:
+                pending = asyncio.ensure_future(anext(iterator))
+            
+            timeout = max(0.0, max_delay - (loop.time() - last_flush)) if buffer else None
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            
+            if done:
+                task, pending = pending, None
+                try:
+                    event = task.result()
+                except StopAsyncIteration:
+                    break
+                
+                buffer += event
+                if len(buffer) < max_size and loop.time() - last_flush < max_delay:
+                    continue
+            
+            if buffer:
+                yield bytes(buffer)
+                buffer.clear()
+            last_flush = loop.time()
+        
+        if buffer:
+            yield bytes(buffer)
+    
+    finally:
+        if pending is not None:
+            pending.cancel()
+            # Let the cancelled read finish so the source generator can be closed
+            await asyncio.wait({pending})
+        await iterator.aclose()
@@ -7,6 +7,9 @@ from fastapi import Header, HTTPException, status
 
 from app.config import settings
 
+# Parse configured keys once instead of re-splitting the setting per request
+VALID_API_KEYS = frozenset(settings.api_keys_list)
+
 
 async def verify_api_key(x_api_key: str = Header(None, alias="X-API-Key")) -> str:
     """
@@ -33,7 +36,7 @@ async def verify_api_key(x_api_key: str = Header(None, alias="X-API-Key")) -> st
         )
     
     # Verify API key
-    if x_api_key not in settings.api_keys_list:
+    if x_api_key not in VALID_API_KEYS:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
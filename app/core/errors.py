@@ -0,0 +1,47 @@
+"""Application-wide error handling.
+
+Converts unexpected exceptions into JSON error responses.
+"""
+
+import logging
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class UnhandledErrorMiddleware:
+    """
+    ASGI middleware returning a JSON 500 response for unhandled exceptions.
+    
+    Registered inside CORSMiddleware so error responses still carry CORS
+    headers. Errors raised after the response has started are re-raised,
+    since the status line has already been sent.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        response_started = False
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            if response_started:
+                raise
+            
+            logger.error(f"Error in {scope['method']} {scope['path']}: {e}", exc_info=True)
+            response = JSONResponse({"detail": str(e)}, status_code=500)
+            await response(scope, receive, send)
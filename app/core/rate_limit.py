@@ -1,35 +1,122 @@
-"""Rate limiting configuration using slowapi.
+"""Rate limiting using an in-process token bucket.
 
 Provides per-API-key rate limiting to prevent abuse.
 """
 
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException, Request, status
 
 from app.config import settings
+from app.core.auth import verify_api_key
+
+
+@dataclass(slots=True)
+class TokenBucket:
+    """Token bucket state for a single client."""
+    
+    tokens: float
+    last_refill: float
 
 
-def get_api_key_identifier(request):
+class TokenBucketLimiter:
+    """
+    Token bucket rate limiter keyed by client identifier.
+    
+    Each client gets a bucket of `capacity` tokens that refills continuously
+    at `rate_per_minute`. A request consumes one token; checks are O(1).
+    At most `max_keys` buckets are kept, evicting the least recently used.
+    """
+    
+    def __init__(self, rate_per_minute: int, capacity: int | None = None, max_keys: int = 10000):
+        """
+        Initialize the limiter.
+        
+        Args:
+            rate_per_minute: Sustained number of requests allowed per minute
+            capacity: Maximum burst size. Defaults to rate_per_minute.
+            max_keys: Maximum number of tracked clients
+        """
+        self.capacity = float(capacity or rate_per_minute)
+        self.refill_rate = rate_per_minute / 60.0  # tokens per second
+        self.max_keys = max_keys
+        self.buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+    
+    def consume(self, key: str) -> float:
+        """
+        Try to consume a token for the given client.
+        
+        The check-and-update contains no awaits, so it is atomic on the
+        event loop without a lock.
+        
+        Args:
+            key: Client identifier
+        
+        Returns:
+            0.0 if the request is allowed, otherwise seconds until a token is available
+        """
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        
+        if bucket is None:
+            if len(self.buckets) >= self.max_keys:
+                self.buckets.popitem(last=False)
+            bucket = self.buckets[key] = TokenBucket(tokens=self.capacity, last_refill=now)
+        else:
+            self.buckets.move_to_end(key)
+            elapsed = now - bucket.last_refill
+            bucket.tokens = min(self.capacity, bucket.tokens + elapsed * self.refill_rate)
+            bucket.last_refill = now
+        
+        if bucket.tokens >= 1.0:
+            bucket.tokens -= 1.0
+            return 0.0
+        
+        return (1.0 - bucket.tokens) / self.refill_rate
+
+
+def get_api_key_identifier(request: Request, api_key: str) -> str:
     """
     Get identifier for rate limiting (API key or IP address).
     
     Args:
         request: FastAPI request object
+        api_key: API key returned by verify_api_key
         
     Returns:
         Identifier string for rate limiting
     """
-    # Try to get API key from header
-    api_key = request.headers.get("X-API-Key")
-    if api_key:
+    # Use the verified API key when authentication is enabled
+    if settings.auth_enabled:
         return f"apikey:{api_key}"
     
     # Fall back to IP address
-    return get_remote_address(request)
+    return request.client.host if request.client else "127.0.0.1"
 
 
 # Create limiter instance
-limiter = Limiter(
-    key_func=get_api_key_identifier,
-    default_limits=[f"{settings.rate_limit_per_minute}/minute"],
-)
+limiter = TokenBucketLimiter(rate_per_minute=settings.rate_limit_per_minute)
+
+
+async def rate_limit(request: Request, api_key: str = Depends(verify_api_key)) -> None:
+    """
+    Dependency enforcing the per-client rate limit.
+    
+    Depends on verify_api_key so rejected requests never create a bucket.
+    
+    Args:
+        request: FastAPI request object
+        api_key: Verified API key
+    
+    Raises:
+        HTTPException: If the client has exceeded its rate limit
+    """
+    retry_after = limiter.consume(get_api_key_identifier(request, api_key))
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(int(retry_after) + 1)},
+        )
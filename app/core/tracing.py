@@ -3,9 +3,19 @@
 Provides observability for LangGraph agent workflows.
 """
 
+import logging
 import os
+from functools import lru_cache
 
+from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Tracing configuration is fixed for the lifetime of the process
+LANGSMITH_ENABLED = settings.langsmith_enabled and bool(settings.langsmith_api_key)
+
+
+@lru_cache(maxsize=1)
 def setup_langsmith() -> None:
     """
     Setup LangSmith tracing for LangGraph workflows.
@@ -13,21 +23,20 @@ def setup_langsmith() -> None:
     LangSmith provides observability for your agent's execution.
     Get your API key at: https://smith.langchain.com/
     
-    Reads configuration from app.config.settings
+    Reads configuration from app.config.settings. Only the first call
+    writes the environment; later calls are no-ops.
     """
-    from app.config import settings
-    
-    if settings.langsmith_enabled and settings.langsmith_api_key:
+    if LANGSMITH_ENABLED:
         os.environ["LANGCHAIN_TRACING_V2"] = "true"
         os.environ["LANGCHAIN_API_KEY"] = settings.langsmith_api_key
         os.environ["LANGCHAIN_PROJECT"] = settings.langsmith_project
-        print(f"✓ LangSmith tracing enabled (project: {settings.langsmith_project})")
+        logger.info(f"✓ LangSmith tracing enabled (project: {settings.langsmith_project})")
     else:
         os.environ["LANGCHAIN_TRACING_V2"] = "false"
         if not settings.langsmith_enabled:
-            print("✓ LangSmith tracing disabled (LANGSMITH_ENABLED=false)")
+            logger.info("✓ LangSmith tracing disabled (LANGSMITH_ENABLED=false)")
         elif not settings.langsmith_api_key:
-            print("✓ LangSmith tracing disabled (no API key)")
+            logger.info("✓ LangSmith tracing disabled (no API key)")
 
 
 def is_langsmith_enabled() -> bool:
@@ -37,4 +46,4 @@ def is_langsmith_enabled() -> bool:
     Returns:
         True if tracing is enabled, False otherwise
     """
-    return os.environ.get("LANGCHAIN_TRACING_V2", "false").lower() == "true"
+    return LANGSMITH_ENABLED
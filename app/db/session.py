@@ -16,6 +16,11 @@ engine = create_async_engine(
     settings.database_url,
     echo=settings.database_echo,
     future=True,
+    pool_size=settings.database_pool_size,
+    max_overflow=settings.database_max_overflow,
+    pool_timeout=settings.database_pool_timeout,
+    pool_pre_ping=True,
+    pool_recycle=settings.database_pool_recycle,
 )
 
 # Create async session factory
@@ -1,19 +1,72 @@
 """Main FastAPI application entry point."""
 
+import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
 
+from app.agent.checkpointer import get_checkpointer
+from app.agent.graph import create_agent_graph
 from app.api.routes import router
 from app.config import settings
+from app.core.errors import UnhandledErrorMiddleware
 from app.core.logging import setup_logging
-from app.core.rate_limit import limiter
 from app.core.tracing import setup_langsmith
 from app.db.session import create_db_and_tables
+from app.mcp.client import MCPClientManager
+
+logger = logging.getLogger(__name__)
+
+# Convert asyncpg URL to psycopg format (remove +asyncpg)
+checkpointer_url = settings.database_url.replace('+asyncpg', '')
+
+
+async def setup_checkpointer(app: FastAPI) -> AsyncConnectionPool:
+    """
+    Open the checkpointer connection pool and compile the agent graph.
+    
+    Checkpoint reads and writes share a long-lived pool so concurrent chats
+    do not serialize on a single connection.
+    
+    Args:
+        app: FastAPI application to store the checkpointer on
+        
+    Returns:
+        The open connection pool, to be closed on shutdown
+    """
+    pool = AsyncConnectionPool(
+        checkpointer_url,
+        min_size=settings.checkpointer_pool_min_size,
+        max_size=settings.checkpointer_pool_max_size,
+        kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+        open=False,
+    )
+    await pool.open()
+    
+    # Close the pool if startup fails so its workers stop reconnecting
+    try:
+        await pool.wait()
+        
+        checkpointer = get_checkpointer(pool)
+        
+        # Setup checkpoint tables
+        await checkpointer.setup()
+        
+        # Compile the agent graph once and reuse it across requests
+        agent_graph = create_agent_graph(checkpointer=checkpointer)
+    except BaseException:
+        await pool.close()
+        raise
+    
+    # Store checkpointer and graph in app state for access in routes
+    app.state.checkpointer_pool = pool
+    app.state.checkpointer = checkpointer
+    app.state.agent_graph = agent_graph
+    
+    return pool
 
 
 @asynccontextmanager
@@ -24,66 +77,58 @@ async def lifespan(app: FastAPI):
     Handles startup and shutdown events, including checkpointer initialization.
     """
     # Startup
-    setup_logging()
+    setup_logging(settings.log_level, settings.json_logs)
     setup_langsmith()  # Now reads from settings directly
     
     # Create database tables if they don't exist
     await create_db_and_tables()
     
     # Initialize MCP client manager
-    from app.mcp.client import MCPClientManager
-    from app.config import settings as app_settings
-    
     try:
-        async with MCPClientManager(app_settings.mcp_servers_config) as mcp_manager:
+        async with MCPClientManager(settings.mcp_servers_config) as mcp_manager:
             # Store MCP manager in app state
             app.state.mcp_manager = mcp_manager
             
-            # Get tool counts
-            all_tools = mcp_manager.get_all_tools()
-            total_tools = sum(len(tools) for tools in all_tools.values())
-            enabled_servers = mcp_manager.get_enabled_servers()
-            
-            print(f"✓ MCP Manager initialized")
-            print(f"  - {len(enabled_servers)} server(s) enabled: {', '.join(enabled_servers)}")
-            print(f"  - {total_tools} tool(s) available from external servers")
+            if logger.isEnabledFor(logging.INFO):
+                # Get tool counts
+                all_tools = mcp_manager.get_all_tools()
+                total_tools = sum(len(tools) for tools in all_tools.values())
+                enabled_servers = mcp_manager.get_enabled_servers()
+                
+                logger.info("✓ MCP Manager initialized")
+                logger.info(f"  - {len(enabled_servers)} server(s) enabled: {', '.join(enabled_servers)}")
+                logger.info(f"  - {total_tools} tool(s) available from external servers")
             
             # Initialize PostgreSQL checkpointer for conversation memory
-            # Convert asyncpg URL to psycopg format (remove +asyncpg)
-            checkpointer_url = settings.database_url.replace('+asyncpg', '')
+            pool = await setup_checkpointer(app)
             
-            # Use async context manager to manage connection lifecycle
-            async with AsyncPostgresSaver.from_conn_string(checkpointer_url) as checkpointer:
-                # Setup checkpoint tables
-                await checkpointer.setup()
-                
-                # Store checkpointer in app state for access in routes
-                app.state.checkpointer = checkpointer
-                
-                print(f"✓ Checkpointer initialized with PostgreSQL")
-                print(f"✓ Database: {checkpointer_url.split('@')[1] if '@' in checkpointer_url else 'configured'}")
-                
+            logger.info("✓ Checkpointer initialized with PostgreSQL")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"✓ Database: {checkpointer_url.split('@')[1] if '@' in checkpointer_url else 'configured'}")
+            
+            try:
                 yield
-                
-                # Cleanup happens automatically when exiting async contexts
-                print("Shutting down checkpointer...")
+            finally:
+                logger.info("Shutting down checkpointer...")
+                await pool.close()
             
-            print("Shutting down MCP manager...")
+            logger.info("Shutting down MCP manager...")
     
     except Exception as e:
-        print(f"Error initializing MCP manager: {e}")
-        print("Continuing with built-in tools only...")
+        logger.error(f"Error initializing MCP manager: {e}")
+        logger.info("Continuing with built-in tools only...")
         
         # Fallback: continue without MCP manager
         app.state.mcp_manager = None
         
         # Still initialize checkpointer
-        checkpointer_url = settings.database_url.replace('+asyncpg', '')
-        async with AsyncPostgresSaver.from_conn_string(checkpointer_url) as checkpointer:
-            await checkpointer.setup()
-            app.state.checkpointer = checkpointer
-            print(f"✓ Checkpointer initialized (fallback mode)")
+        pool = await setup_checkpointer(app)
+        logger.info("✓ Checkpointer initialized (fallback mode)")
+        
+        try:
             yield
+        finally:
+            await pool.close()
 
 
 # Create FastAPI app
@@ -94,32 +139,26 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# Add rate limiting
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+# Convert unexpected errors to JSON responses (added first so it sits inside CORS)
+app.add_middleware(UnhandledErrorMiddleware)
 
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins_list,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
+    allow_headers=["authorization", "content-type", "x-api-key"],
+    max_age=600,
 )
 
 # Include API routes
 app.include_router(router)
 
 
-@app.middleware("http")
-async def add_request_to_limiter(request: Request, call_next):
-    """Add request to rate limiter context."""
-    request.state.limiter = limiter
-    response = await call_next(request)
-    return response
-
-
 if __name__ == "__main__":
+    import sys
+    
     import uvicorn
     
     uvicorn.run(
@@ -127,4 +166,9 @@ if __name__ == "__main__":
         host=settings.api_host,
         port=settings.api_port,
         reload=settings.api_reload,
+        # uvloop is not available on Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        # uvicorn ignores workers when reloading
+        workers=None if settings.api_reload else settings.api_workers,
     )
@@ -2,7 +2,9 @@
 
 import pytest
 from fastapi.testclient import TestClient
+from unittest.mock import MagicMock
 
+from app.api.routes import get_agent_graph
 from app.main import app
 
 
@@ -12,6 +14,15 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture
+def override_agent_graph():
+    """Replace the shared agent graph with a mock for the duration of a test."""
+    mock_graph = MagicMock()
+    app.dependency_overrides[get_agent_graph] = lambda: mock_graph
+    yield mock_graph
+    app.dependency_overrides.pop(get_agent_graph, None)
+
+
 @pytest.fixture
 def sample_chat_request():
     """Sample chat request payload."""
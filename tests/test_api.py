@@ -1,7 +1,10 @@
 """Tests for API endpoints."""
 
 import pytest
-from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock
+
+from app.main import app
 
 
 def test_health_check(client):
@@ -15,7 +18,7 @@ def test_health_check(client):
 
 
 @pytest.mark.asyncio
-async def test_chat_endpoint_success(client):
+async def test_chat_endpoint_success(client, override_agent_graph):
     """Test successful chat interaction."""
     # Mock the agent graph to avoid actual LLM calls
     mock_result = {
@@ -27,18 +30,56 @@ async def test_chat_endpoint_success(client):
         ]
     }
     
-    with patch('app.api.routes.create_agent_graph') as mock_graph:
-        mock_graph.return_value.ainvoke = AsyncMock(return_value=mock_result)
-        
-        response = client.post(
-            "/chat",
-            json={"message": "Hello"}
-        )
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert "response" in data
-        assert data["response"] == "Hello! How can I help you today?"
+    override_agent_graph.ainvoke = AsyncMock(return_value=mock_result)
+    
+    response = client.post(
+        "/chat",
+        json={"message": "Hello"}
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert "response" in data
+    assert data["response"] == "Hello! How can I help you today?"
+
+
+def test_chat_endpoint_debug_tool_calls(client, override_agent_graph):
+    """Test that tool calls are only returned when debug is requested."""
+    mock_result = {
+        "messages": [
+            type('MockMessage', (), {
+                'content': '',
+                'tool_calls': [{"name": "calculate_tool", "args": {"expression": "2 + 2"}}]
+            })(),
+            type('MockMessage', (), {'content': 'The answer is 4.'})(),
+        ]
+    }
+    
+    override_agent_graph.ainvoke = AsyncMock(return_value=mock_result)
+    
+    response = client.post("/chat", json={"message": "What is 2 + 2?"})
+    assert response.json()["tool_calls"] is None
+    
+    response = client.post("/chat?debug=true", json={"message": "What is 2 + 2?"})
+    assert response.json()["tool_calls"] == [
+        {"name": "calculate_tool", "args": {"expression": "2 + 2"}}
+    ]
+
+
+def test_chat_endpoint_unhandled_error(override_agent_graph):
+    """Test that unexpected errors return a JSON 500 with CORS headers."""
+    override_agent_graph.ainvoke = AsyncMock(side_effect=RuntimeError("LLM unavailable"))
+    
+    client = TestClient(app, raise_server_exceptions=False)
+    response = client.post(
+        "/chat",
+        json={"message": "Hello"},
+        headers={"Origin": "http://localhost:3000"},
+    )
+    
+    assert response.status_code == 500
+    assert response.json() == {"detail": "LLM unavailable"}
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
 
 
 def test_chat_endpoint_validation(client):
@@ -60,3 +101,54 @@ def test_chat_endpoint_missing_message(client):
     )
     
     assert response.status_code == 422  # Validation error
+
+
+def test_token_bucket_limiter():
+    """Test that the rate limiter blocks once the bucket is empty."""
+    from app.core.rate_limit import TokenBucketLimiter
+    
+    limiter = TokenBucketLimiter(rate_per_minute=60, capacity=2)
+    
+    assert limiter.consume("client") == 0.0
+    assert limiter.consume("client") == 0.0
+    assert limiter.consume("client") > 0.0
+    # Other clients have their own bucket
+    assert limiter.consume("other") == 0.0
+
+
+def test_token_bucket_limiter_caps_tracked_clients():
+    """Test that the limiter evicts the least recently used client past max_keys."""
+    from app.core.rate_limit import TokenBucketLimiter
+    
+    limiter = TokenBucketLimiter(rate_per_minute=60, capacity=1, max_keys=3)
+    
+    for key in ("a", "b", "c"):
+        limiter.consume(key)
+    # Touch "a" so "b" becomes the least recently used
+    limiter.consume("a")
+    
+    for i in range(100):
+        limiter.consume(f"new-{i}")
+        assert len(limiter.buckets) == 3
+    
+    assert "b" not in limiter.buckets
+    assert list(limiter.buckets) == ["new-97", "new-98", "new-99"]
+
+
+def test_rate_limit_skips_unauthenticated_requests(client, monkeypatch):
+    """Test that requests rejected by auth never create a rate limit bucket."""
+    from app.config import settings
+    from app.core.rate_limit import limiter
+    
+    monkeypatch.setattr(settings, "auth_enabled", True)
+    buckets_before = list(limiter.buckets)
+    
+    for i in range(3):
+        response = client.post(
+            "/chat",
+            json={"message": "Hello"},
+            headers={"X-API-Key": f"junk-{i}"},
+        )
+        assert response.status_code == 401
+    
+    assert list(limiter.buckets) == buckets_before
@@ -1,19 +1,23 @@
 """Tests for streaming endpoints."""
 
+import asyncio
+
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from langchain_core.messages import AIMessage, ToolMessage
+
+from app.api.streaming import coalesce_events
 
 
 @pytest.mark.asyncio
-async def test_stream_endpoint_success(client):
+async def test_stream_endpoint_success(client, override_agent_graph):
     """Test streaming endpoint with successful response."""
     # Mock the agent graph
     mock_event_1 = {
         "agent": {
             "messages": [
-                MagicMock(
+                AIMessage(
                     content="",
-                    tool_calls=[{"name": "add_todo", "args": {"task": "Test"}}]
+                    tool_calls=[{"name": "add_todo", "args": {"task": "Test"}, "id": "call_1"}]
                 )
             ]
         }
@@ -22,7 +26,11 @@ async def test_stream_endpoint_success(client):
     mock_event_2 = {
         "tools": {
             "messages": [
-                MagicMock(name="add_todo", content='{"id": 1, "task": "Test"}')
+                ToolMessage(
+                    name="add_todo",
+                    content='{"id": 1, "task": "Test"}',
+                    tool_call_id="call_1",
+                )
             ]
         }
     }
@@ -30,25 +38,29 @@ async def test_stream_endpoint_success(client):
     mock_event_3 = {
         "agent": {
             "messages": [
-                MagicMock(content="I've added the task!", tool_calls=[])
+                AIMessage(content="I've added the task!")
             ]
         }
     }
     
-    async def mock_astream(input_data):
+    received_configs = []
+    
+    async def mock_astream(input_data, config=None):
+        received_configs.append(config)
         yield mock_event_1
         yield mock_event_2
         yield mock_event_3
     
-    with patch('app.api.routes.create_agent_graph') as mock_graph:
-        mock_graph_instance = MagicMock()
-        mock_graph_instance.astream = mock_astream
-        mock_graph.return_value = mock_graph_instance
-        
-        response = client.get("/chat/stream?message=Add todo: Test")
-        
-        assert response.status_code == 200
-        assert "text/event-stream" in response.headers.get("content-type", "")
+    override_agent_graph.astream = mock_astream
+    
+    response = client.get("/chat/stream?message=Add todo: Test&session_id=abc")
+    
+    assert response.status_code == 200
+    assert received_configs == [{"configurable": {"thread_id": "abc"}}]
+    assert "text/event-stream" in response.headers.get("content-type", "")
+    assert 'event: tool_call\ndata: {"name":"add_todo","args":{"task":"Test"}}\n\n' in response.text
+    assert 'event: answer\ndata: {"content":"I\'ve added the task!"}\n\n' in response.text
+    assert response.text.endswith("event: done\ndata: {}\n\n")
 
 
 def test_stream_endpoint_missing_message(client):
@@ -63,3 +75,66 @@ def test_stream_endpoint_empty_message(client):
     response = client.get("/chat/stream?message=")
     
     assert response.status_code == 422  # Validation error
+
+
+@pytest.mark.asyncio
+async def test_coalesce_events_batches_bursts():
+    """Test that a burst is held until max_delay, then sent as one chunk."""
+    async def burst():
+        yield b"a"
+        yield b"b"
+        yield b"c"
+        await asyncio.sleep(0.2)
+        yield b"d"
+    
+    chunks = [chunk async for chunk in coalesce_events(burst(), max_delay=0.05)]
+    
+    # The burst is flushed by the timeout; "d" arrives after idle and goes out alone
+    assert chunks == [b"abc", b"d"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_events_flushes_at_max_size():
+    """Test that a full buffer is flushed without waiting for max_delay."""
+    async def burst():
+        yield b"aa"
+        yield b"bb"
+        yield b"c"
+    
+    chunks = [chunk async for chunk in coalesce_events(burst(), max_size=4, max_delay=1.0)]
+    
+    assert chunks == [b"aabb", b"c"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_events_flushes_first_event_after_idle():
+    """Test that the first event after an idle period is sent immediately."""
+    async def idle_then_burst():
+        await asyncio.sleep(0.2)
+        yield b"a"
+        yield b"b"
+    
+    chunks = [chunk async for chunk in coalesce_events(idle_then_burst(), max_delay=0.1)]
+    
+    # "a" is not held back waiting for "b"; only the follow-up event is buffered
+    assert chunks == [b"a", b"b"]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_events_closes_source():
+    """Test that the source generator is closed when the consumer stops early."""
+    closed = asyncio.Event()
+    
+    async def endless():
+        try:
+            while True:
+                yield b"a"
+                await asyncio.sleep(1)
+        finally:
+            closed.set()
+    
+    stream = coalesce_events(endless(), max_delay=0.01)
+    assert await anext(stream) == b"a"
+    await stream.aclose()
+    
+    assert closed.is_set()